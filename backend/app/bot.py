@@ -1,4 +1,7 @@
-from typing import Dict, Any
+import asyncio
+import copy
+import time
+from typing import Dict, Any, Optional
 import os
 from dotenv import load_dotenv
 from loguru import logger
@@ -11,6 +14,7 @@ print("🚀 Starting Pipecat bot...")
 print("⏳ Loading models and imports (20 seconds, first run only)\n")
 
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
+from pipecat.audio.turn.smart_turn.base_smart_turn import BaseSmartTurn
 from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
 logger.info("✅ Local Smart Turn Analyzer V3 loaded")
 logger.info("Loading Silero VAD model...")
@@ -19,7 +23,7 @@ from pipecat.audio.vad.silero import SileroVADAnalyzer
 
 logger.info("✅ Silero VAD model loaded")
 
-from pipecat.audio.vad.vad_analyzer import VADParams
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
 from pipecat.frames.frames import Frame, LLMMessagesAppendFrame, LLMRunFrame, TranscriptionFrame
 
 logger.info("Loading pipeline components...")
@@ -29,6 +33,7 @@ from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.llm_context import LLMContext
 from pipecat.processors.aggregators.llm_response_universal import LLMContextAggregatorPair
+from pipecat.processors.aggregators.llm_text_processor import LLMTextProcessor
 
 from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor
 from pipecat.runner.types import RunnerArguments, WebSocketRunnerArguments
@@ -45,34 +50,158 @@ from pipecat.transports.websocket.fastapi import (
 from pipecat.processors.frameworks.rtvi import RTVIServerMessageFrame
 from deepgram import LiveOptions
 from pipecat.adapters.schemas.function_schema import FunctionSchema
-from app.services.rag import RAGService
+from pipecat.utils.text.base_text_aggregator import Aggregation, AggregationType
+from pipecat.utils.text.simple_text_aggregator import SimpleTextAggregator
+from app.services.rag import get_rag_service
 from app.config import settings
 from app.database import get_database
 from app.prompts import get_prompt
 from bson import ObjectId
 from datetime import datetime
 
+
+# Session-independent configuration, built once at import instead of per connection.
+SEARCH_TOOL = FunctionSchema(
+    name="search_knowledge_base",
+    description="Search the uploaded knowledge base documents for relevant information. Only call this when the user asks a factual question that requires looking up document content. Do NOT call for greetings or casual conversation.",
+    properties={
+        "query": {
+            "type": "string",
+            "description": "A specific search query to find relevant information in the knowledge base documents. Should be a clear, descriptive phrase related to the user's question."
+        }
+    },
+    required=["query"]
+)
+
+TOOLS_SCHEMA = ToolsSchema(standard_tools=[SEARCH_TOOL])
+
+LIVE_OPTIONS = LiveOptions(
+    diarize=True
+)
+
+# Model weights are loaded once per process; connections get their own analyzers on top.
+# Both run on ONNX Runtime (CPU). Smart Turn ships as the int8-quantized "-cpu" build and
+# Silero VAD is a ~2 MB model whose per-frame cost is dominated by session overhead, so
+# neither is worth re-quantizing here.
+SILERO_VAD_MODEL = SileroVADAnalyzer(params=VADParams(stop_secs=0.2))
+SMART_TURN_MODEL = LocalSmartTurnAnalyzerV3()
+
+
 class TextCaptureProcessor(FrameProcessor):
+    LANGUAGE = Language.EN_IN
+
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         await super().process_frame(frame, direction)
         if isinstance(frame, LLMMessagesAppendFrame):
-            for message in frame.messages:
-                if message.get("role") == "user":
+            user_messages = [m for m in frame.messages if m.get("role") == "user"]
+            if user_messages:
+                # One timestamp per appended batch; the messages arrive together.
+                timestamp = datetime.now().isoformat()
+                for message in user_messages:
                     await self.push_frame(
                         TranscriptionFrame(
                             text=message.get('content'),
                             user_id="agent",
-                            timestamp=datetime.now().isoformat(),
-                            language=Language.EN_IN
+                            timestamp=timestamp,
+                            language=self.LANGUAGE
                         )
                     )
         await self.push_frame(frame, direction)
 
 
+class ClauseTextAggregator(SimpleTextAggregator):
+    """Sentence aggregator that also releases long clauses so TTS can start speaking sooner."""
+
+    CLAUSE_PUNCTUATION = (",", ";", ":")
+    MIN_CLAUSE_WORDS = 4
+    MAX_WORDS = 60
+
+    async def _check_sentence_with_lookahead(self, char: str) -> Optional[Aggregation]:
+        result = await super()._check_sentence_with_lookahead(char)
+        # Only cut on whitespace so "1,000" or "10:30" are never split.
+        if result or not char.isspace():
+            return result
+
+        clause = self._text.rstrip()
+        words = len(clause.split())
+        # ";" also starts Pipecat's sentence lookahead, which never splits on it,
+        # so a clause mark followed by whitespace ends the clause regardless.
+        at_clause_end = clause.endswith(self.CLAUSE_PUNCTUATION) and words >= self.MIN_CLAUSE_WORDS
+        if at_clause_end or (words >= self.MAX_WORDS and not self._needs_lookahead):
+            self._text = ""
+            self._needs_lookahead = False
+            return Aggregation(text=clause.strip(" "), type=AggregationType.SENTENCE)
+        return None
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """Silero VAD analyzer that reuses the ONNX session of a preloaded analyzer.
+
+    The recurrent model state and VAD buffers stay per connection.
+    """
+
+    def __init__(self, *, template: SileroVADAnalyzer, params: Optional[VADParams] = None):
+        VADAnalyzer.__init__(self, params=params)
+        self._model = copy.copy(template._model)
+        self._model.reset_states()
+        self._last_reset_time = 0
+
+
+class SharedSmartTurnAnalyzer(LocalSmartTurnAnalyzerV3):
+    """Smart Turn v3 analyzer that reuses the ONNX session of a preloaded analyzer.
+
+    The turn audio buffer and inference thread stay per connection.
+    """
+
+    def __init__(self, *, template: LocalSmartTurnAnalyzerV3, **kwargs):
+        BaseSmartTurn.__init__(self, **kwargs)
+        self._feature_extractor = template._feature_extractor
+        self._session = template._session
+
+
+class SharedClientGroqLLMService(GroqLLMService):
+    """Groq LLM service that reuses one HTTP client, and its warm connections, across sessions.
+
+    Pipecat processors belong to a single pipeline, so the service itself stays per
+    session; only the OpenAI-compatible client, which Pipecat never closes, is shared.
+    """
+
+    _shared_client = None
+
+    def create_client(self, api_key=None, base_url=None, **kwargs):
+        cls = type(self)
+        if cls._shared_client is None:
+            cls._shared_client = super().create_client(api_key, base_url, **kwargs)
+        return cls._shared_client
+
+
 logger.info("✅ All components loaded successfully!")
 
 load_dotenv(override=True)
 
+EQUIPMENT_TENANT_TTL_SECONDS = 60
+_equipment_tenants: Dict[str, tuple[float, str]] = {}
+
+
+async def get_equipment_tenant_id(equipment_id: str) -> Optional[str]:
+    """Look up the tenant owning an equipment, caching hits for a short TTL"""
+    cached = _equipment_tenants.get(equipment_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    if not ObjectId.is_valid(equipment_id):
+        raise ValueError(f"Invalid equipment_id: {equipment_id}")
+
+    db = get_database()
+    equipment = await db.equipment.find_one(
+        {"_id": ObjectId(equipment_id)},
+        projection={"tenant_id": 1, "_id": 0},
+    )
+    tenant_id = equipment.get("tenant_id") if equipment else None
+    if tenant_id:
+        _equipment_tenants[equipment_id] = (time.monotonic() + EQUIPMENT_TENANT_TTL_SECONDS, tenant_id)
+    return tenant_id
+
 
 async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
     logger.info(f"Starting bot")
@@ -86,19 +215,13 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
     # If tenant_id isn't explicitly provided, infer it from the equipment.
     if equipment_id and "tenant_id" not in body:
         try:
-            db = get_database()
-            equipment = await db.equipment.find_one({"_id": ObjectId(equipment_id)})
-            if equipment and equipment.get("tenant_id"):
-                tenant_id = equipment["tenant_id"]
+            tenant_id = await get_equipment_tenant_id(equipment_id) or tenant_id
         except Exception as e:
             logger.warning(f"Failed to infer tenant_id from equipment_id={equipment_id}: {e}")
 
-    live_options = LiveOptions(
-        diarize=True
-    )
     stt = DeepgramSTTService(
         api_key=os.getenv("DEEPGRAM_API_KEY"),
-        live_options=live_options,
+        live_options=LIVE_OPTIONS,
     )
 
     rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
@@ -106,7 +229,7 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
     async def search_knowledge_base(params: FunctionCallParams):
         try:
             query = params.arguments.get("query", "")
-            rag_service = RAGService()
+            rag_service = get_rag_service()
             retrieval_result = await rag_service.retrieve(
                 query=query, 
                 k=5, 
@@ -114,34 +237,24 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
                 tenant_id=tenant_id
             )
 
-            clean_data = [
-                {
-                    "id": meta.chunk_id,
-                    "content": chunk.text,
-                }
-                for chunk, meta in zip(retrieval_result.data,
-                                    retrieval_result.metadata.chunks)
-            ]
-
-            await params.result_callback({"results": clean_data})
-
-            await rtvi.push_frame(
-                RTVIServerMessageFrame(
-                    data={
-                        "type":"search_knowledge_base",
-                        "chunks":[
-                            {
-                                "id": meta.chunk_id,
-                                "text": chunk.text,
-                                "metadata": meta.model_dump()
-                            }
-                            for chunk, meta in zip(
-                                retrieval_result.data,
-                                retrieval_result.metadata.chunks
-                            )
-                        ]
-                    }
-                )
+            clean_data = []
+            chunks_payload = []
+            for chunk, meta in zip(retrieval_result.data, retrieval_result.metadata.chunks):
+                chunk_id, text = meta.chunk_id, chunk.text
+                clean_data.append({"id": chunk_id, "content": text})
+                chunks_payload.append({"id": chunk_id, "text": text, "metadata": meta.model_dump()})
+
+            # Hand results to the LLM while the UI frame is pushed, rather than one after the other.
+            await asyncio.gather(
+                params.result_callback({"results": clean_data}),
+                rtvi.push_frame(
+                    RTVIServerMessageFrame(
+                        data={
+                            "type":"search_knowledge_base",
+                            "chunks": chunks_payload,
+                        }
+                    )
+                ),
             )
 
         except Exception as e:
@@ -149,19 +262,7 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
             await params.result_callback({"results": []})
 
 
-    search_tool = FunctionSchema(
-        name="search_knowledge_base",
-        description="Search the uploaded knowledge base documents for relevant information. Only call this when the user asks a factual question that requires looking up document content. Do NOT call for greetings or casual conversation.",
-        properties={
-            "query": {
-                "type": "string",
-                "description": "A specific search query to find relevant information in the knowledge base documents. Should be a clear, descriptive phrase related to the user's question."
-            }
-        },
-        required=["query"]
-    )
-
-    llm = GroqLLMService(
+    llm = SharedClientGroqLLMService(
         api_key=os.getenv("GROQ_API_KEY"),
         model=settings.GROQ_MODEL,
         base_url=settings.GROQ_BASE_URL,
@@ -180,7 +281,7 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
         },
     ]
 
-    context = LLMContext(messages, tools=ToolsSchema(standard_tools=[search_tool]))
+    context = LLMContext(messages, tools=TOOLS_SCHEMA)
     context_aggregator = LLMContextAggregatorPair(context)
 
     tts = ElevenLabsTTSService(
@@ -195,6 +296,7 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
         stt,
         context_aggregator.user(),  # User responses
         llm,  # LLM
+        LLMTextProcessor(text_aggregator=ClauseTextAggregator()),  # Early clause flushing for TTS
         tts, # TTS
         transport.output(),  # Transport bot output
         context_aggregator.assistant(),  # Assistant spoken responses
@@ -249,9 +351,9 @@ async def bot(runner_args: WebSocketRunnerArguments):
             audio_in_enabled=True,
             audio_out_enabled=True,
             add_wav_header=False,
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
+            vad_analyzer=SharedSileroVADAnalyzer(template=SILERO_VAD_MODEL, params=VADParams(stop_secs=0.2)),
             serializer=ProtobufFrameSerializer(),
-            turn_analyzer=LocalSmartTurnAnalyzerV3(),
+            turn_analyzer=SharedSmartTurnAnalyzer(template=SMART_TURN_MODEL),
         ),
     )
 
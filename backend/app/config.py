@@ -1,10 +1,15 @@
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     # MongoDB Settings
     MONGO_URL: str
     DB_NAME: str = "live_db"
+    MONGO_MAX_POOL_SIZE: int = 200
+    MONGO_MIN_POOL_SIZE: int = 20
+    MONGO_COMPRESSORS: str = "zlib"  # zstd/snappy need extra client packages
 
     DEEPGRAM_API_KEY: str
     GROQ_API_KEY: str
@@ -22,6 +27,20 @@ class Settings(BaseSettings):
     DOCUMENT_CHUNKS_COLLECTION: str = "document_chunks"
     TENANT_ID: str = "mvp_tenant"
 
+    # Retrieval cache
+    RAG_CACHE_SIZE: int = 1024  # 0 disables the cache
+    RAG_CACHE_TTL_SECONDS: int = 60
+    EMBEDDING_CACHE_SIZE: int = 4096  # texts; 0 disables the cache
+    CACHE_WARM_QUERIES: list[str] = []  # embedded at startup, e.g. '["how do I reset it"]'
+
+    # Upload text extraction runs in a process pool of this many workers
+    EXTRACTION_WORKERS: int = 2
+
+    # WebSocket limits (worst case per connection is roughly size * queue).
+    # uvicorn takes them as CLI flags, so the Docker/compose commands read the same env vars.
+    WS_MAX_SIZE: int = 262144  # bytes per incoming message
+    WS_MAX_QUEUE: int = 8  # incoming messages buffered before back-pressure
+
     #Hard Coded
     USER_ID: str = "mvp_user"
     
@@ -32,18 +51,30 @@ class Settings(BaseSettings):
     # Error Tracking
     SENTRY_DSN: str = ""
     SENTRY_ENVIRONMENT: str = "development"
+    SENTRY_TRACES_SAMPLE_RATE: float = 0.01
+    SENTRY_PROFILES_SAMPLE_RATE: float = 0.0
+    SENTRY_ATTACH_STACKTRACE: bool = False  # stack traces on non-exception events
     
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_UPLOADS: int = 10  # requests per minute
     RATE_LIMIT_RETRIEVAL: int = 100  # requests per minute
+    RATE_LIMIT_REDIS_URL: str = ""  # e.g. "redis://localhost:6379" (needs the redis package)
     
     # Logging
     LOG_LEVEL: str = "INFO"
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        frozen=True,
+    )
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Get the process-wide settings, parsed from the environment once"""
+    return Settings()
 
 
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
@@ -19,6 +19,10 @@ async def connect_to_mongo():
             serverSelectionTimeoutMS=30000,  # 30 seconds timeout
             connectTimeoutMS=30000,
             socketTimeoutMS=30000,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            compressors=[c for c in settings.MONGO_COMPRESSORS.split(",") if c],
+            retryReads=True,
             # TLS is automatically enabled for mongodb+srv:// connections
             # System CA certificates (installed via ca-certificates package) will be used
         )
@@ -30,6 +34,23 @@ async def connect_to_mongo():
         logger.error(f"❌ Failed to connect to MongoDB: {str(e)}")
         raise
 
+    await ensure_indexes()
+
+
+async def ensure_indexes():
+    """Create the indexes the API queries rely on (no-op if they exist)"""
+    try:
+        # Document listing: equality on equipment_id, newest first
+        await database.documents_metadata.create_index([("equipment_id", 1), ("created_at", -1)])
+        # Chunk cleanup when an equipment or document is deleted
+        await database[settings.DOCUMENT_CHUNKS_COLLECTION].create_index([("equipment_id", 1), ("document_id", 1)])
+        # Duplicate-name check on create, and enforcement of the same rule
+        await database.equipment.create_index([("name", 1), ("tenant_id", 1)], unique=True)
+        logger.info("✅ MongoDB indexes ensured")
+    except Exception as e:
+        # Don't block startup, e.g. when existing data violates the unique index
+        logger.warning(f"⚠️ Failed to create MongoDB indexes: {str(e)}")
+
 
 async def close_mongo_connection():
     """Close database connection"""
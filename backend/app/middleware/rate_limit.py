@@ -3,6 +3,7 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi import Request
+from app.config import settings
 
 
 def get_client_identifier(request: Request) -> str:
@@ -13,15 +14,17 @@ def get_client_identifier(request: Request) -> str:
     """
     forwarded = request.headers.get("X-Forwarded-For")
     if forwarded:
-        return forwarded.split(",")[0]
+        return forwarded.split(",", 1)[0].strip()
     return get_remote_address(request)
 
 
-# Initialize limiter
+# Initialize limiter. With Redis configured, counters are shared by all workers and the
+# moving window is evaluated atomically server-side; otherwise counters are per process.
 limiter = Limiter(
     key_func=get_client_identifier,
     default_limits=["100/minute"],
-    storage_uri="memory://",  # Use Redis in production: "redis://localhost:6379"
+    storage_uri=settings.RATE_LIMIT_REDIS_URL or "memory://",
+    strategy="moving-window" if settings.RATE_LIMIT_REDIS_URL else "fixed-window",
 )
 
 
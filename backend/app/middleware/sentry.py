@@ -23,11 +23,11 @@ def init_sentry():
             dsn=sentry_dsn,
             environment=settings.SENTRY_ENVIRONMENT,
             
-            # Performance monitoring - sample 10% of transactions
-            traces_sample_rate=0.1,
+            # Performance monitoring - sample 1% of transactions by default
+            traces_sample_rate=settings.SENTRY_TRACES_SAMPLE_RATE,
             
-            # Profiling - sample 10% of profiled transactions
-            profiles_sample_rate=0.1,
+            # Profiling - off by default; stack sampling is costly on the voice pipeline
+            profiles_sample_rate=settings.SENTRY_PROFILES_SAMPLE_RATE,
             
             # FastAPI integration (automatically enabled when fastapi is installed)
             integrations=[
@@ -39,9 +39,12 @@ def init_sentry():
             send_default_pii=False,
             
             # Additional debugging options
-            attach_stacktrace=True,
+            attach_stacktrace=settings.SENTRY_ATTACH_STACKTRACE,
             max_breadcrumbs=50,
             
+            # Only our own frames are marked in-app
+            in_app_include=["app"],
+            
             # Release tracking (optional - can use git commit hash)
             # release="your-app@1.0.0",
             
@@ -181,6 +181,16 @@ Use only information from uploaded documents
 Be precise and factual
 """
 
+_PROMPTS = {
+    "call_center": CALL_CENTER_AGENT_PROMPT,
+    "technical": TECHNICAL_SUPPORT_PROMPT,
+    "customer_service": CUSTOMER_SERVICE_PROMPT,
+    "sales": SALES_SUPPORT_PROMPT,
+    "emergency": EMERGENCY_RESPONSE_PROMPT,
+    "document_qna": DOCUMENT_QNA_PROMPT,
+}
+
+
 def get_prompt(prompt_type: str = "call_center") -> str:
     """
     Get the appropriate prompt based on the prompt type.
@@ -192,13 +202,4 @@ def get_prompt(prompt_type: str = "call_center") -> str:
     Returns:
         str: The corresponding prompt
     """
-    prompts = {
-        "call_center": CALL_CENTER_AGENT_PROMPT,
-        "technical": TECHNICAL_SUPPORT_PROMPT,
-        "customer_service": CUSTOMER_SERVICE_PROMPT,
-        "sales": SALES_SUPPORT_PROMPT,
-        "emergency": EMERGENCY_RESPONSE_PROMPT,
-        "document_qna": DOCUMENT_QNA_PROMPT,
-    }
-    
-    return prompts.get(prompt_type, CALL_CENTER_AGENT_PROMPT)
+    return _PROMPTS.get(prompt_type, CALL_CENTER_AGENT_PROMPT)
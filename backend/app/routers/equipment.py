@@ -1,13 +1,19 @@
+import asyncio
 import os
 import tempfile
 import uuid
-from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Request
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from functools import partial
+from typing import Awaitable, Callable, List, Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status, UploadFile, File, Form, Request
 from loguru import logger
 from bson import ObjectId
+from bson.binary import Binary, BinaryVectorDtype
+from pymongo.errors import DuplicateKeyError
 from app.services.text_extraction import TextExtractionService
-from app.services.embeddings import EmbeddingService
+from app.services.embeddings import embedding_service
+from app.services.rag import get_rag_service
 
 from app.database import get_database
 from app.models.equipment import Equipment
@@ -18,6 +24,16 @@ from app.middleware.rate_limit import limiter
 
 router = APIRouter()
 
+# Uploads up to this size are extracted from memory without a temp file
+IN_MEMORY_EXTRACTION_LIMIT = 8 * 1024 * 1024
+# Larger uploads are copied to disk in blocks of this size instead of read whole
+UPLOAD_READ_BLOCK_SIZE = 1024 * 1024
+# Chunk documents are written to MongoDB in batches of this many
+CHUNK_INSERT_BATCH_SIZE = 500
+# Only the fields the Equipment model reads
+EQUIPMENT_PROJECTION = {field.alias or name: 1 for name, field in Equipment.model_fields.items()}
+
+
 @router.post("/", response_model=Equipment, status_code=status.HTTP_201_CREATED)
 async def create_equipment(equipment: Equipment):
     
@@ -33,13 +49,19 @@ async def create_equipment(equipment: Equipment):
         )
     
     # Add timestamps
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     equipment_dict = equipment.model_dump(exclude={"id"}, exclude_none=True)
     equipment_dict["created_at"] = now
     equipment_dict["updated_at"] = now
     
-    # Insert into database
-    result = await db.equipment.insert_one(equipment_dict)
+    # Insert into database (the unique index catches concurrent duplicates)
+    try:
+        result = await db.equipment.insert_one(equipment_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Equipment with this name already exists"
+        )
     # Create response with _id as string
     response_dict = equipment.model_dump(exclude={"id"}, exclude_none=True)
     response_dict["_id"] = str(result.inserted_id)
@@ -51,31 +73,25 @@ async def create_equipment(equipment: Equipment):
 async def get_equipment():
     """Get all equipment"""
     db = get_database()
-    equipment_list = await db.equipment.find({}).to_list(length=None)
-    # Convert ObjectId to string for _id field
-    result = []
-    for item in equipment_list:
-        item_dict = dict(item)
-        if '_id' in item_dict and isinstance(item_dict['_id'], ObjectId):
-            item_dict['_id'] = str(item_dict['_id'])
-        result.append(Equipment(**item_dict))
-    return result
+    # Mongo converts _id to a string, so documents validate as-is
+    equipment_list = await db.equipment.aggregate([
+        {"$project": {**EQUIPMENT_PROJECTION, "_id": {"$toString": "$_id"}}},
+    ]).to_list(length=None)
+    return [Equipment.model_validate(item) for item in equipment_list]
 
 
 @router.get("/{equipment_id}", response_model=Equipment, status_code=status.HTTP_200_OK)
 async def get_one_equipment(equipment_id: str):
     """Get an equipment by ID"""
     db = get_database()
-    equipment = await db.equipment.find_one({"_id": ObjectId(equipment_id)})
+    equipment = await db.equipment.find_one({"_id": ObjectId(equipment_id)}, EQUIPMENT_PROJECTION)
     if not equipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Equipment not found"
         )
-    equipment_dict = dict(equipment)
-    if '_id' in equipment_dict and isinstance(equipment_dict['_id'], ObjectId):
-        equipment_dict['_id'] = str(equipment_dict['_id'])
-    return Equipment(**equipment_dict)
+    equipment["_id"] = str(equipment["_id"])
+    return Equipment.model_validate(equipment)
 
 
 @router.delete("/{equipment_id}", status_code=status.HTTP_200_OK)
@@ -98,15 +114,14 @@ async def delete_equipment(equipment_id: str):
             detail="Equipment not found"
         )
 
-    # Remove related chunk embeddings and document metadata first.
-    chunks_result = await db[settings.DOCUMENT_CHUNKS_COLLECTION].delete_many({
-        "equipment_id": equipment_obj_id
-    })
-    docs_result = await db.documents_metadata.delete_many({
-        "equipment_id": equipment_obj_id
-    })
-
-    equipment_result = await db.equipment.delete_one({"_id": equipment_obj_id})
+    # Remove the equipment with its chunk embeddings and document metadata;
+    # the three deletes are independent, so run them concurrently.
+    chunks_result, docs_result, equipment_result = await asyncio.gather(
+        db[settings.DOCUMENT_CHUNKS_COLLECTION].delete_many({"equipment_id": equipment_obj_id}),
+        db.documents_metadata.delete_many({"equipment_id": equipment_obj_id}),
+        db.equipment.delete_one({"_id": equipment_obj_id}),
+    )
+    get_rag_service().invalidate(equipment_id)
 
     return {
         "message": "Equipment deleted successfully",
@@ -138,247 +153,255 @@ async def list_equipment_documents(equipment_id: str):
             detail="Equipment not found"
         )
 
-    cursor = db.documents_metadata.find({"equipment_id": equipment_obj_id}).sort("created_at", -1)
-    docs = await cursor.to_list(length=None)
-
-    # Normalize ObjectIds and datetimes for JSON response
-    for doc in docs:
-        if isinstance(doc.get("_id"), ObjectId):
-            doc["_id"] = str(doc["_id"])
-        if isinstance(doc.get("equipment_id"), ObjectId):
-            doc["equipment_id"] = str(doc["equipment_id"])
-        if hasattr(doc.get("created_at"), "isoformat"):
-            doc["created_at"] = doc["created_at"].isoformat()
-        if hasattr(doc.get("updated_at"), "isoformat"):
-            doc["updated_at"] = doc["updated_at"].isoformat()
+    # ObjectIds and datetimes are converted to strings by Mongo for the JSON response
+    docs = await db.documents_metadata.aggregate([
+        {"$match": {"equipment_id": equipment_obj_id, "is_disabled": {"$ne": True}}},
+        {"$sort": {"created_at": -1}},
+        {"$addFields": {
+            "_id": {"$toString": "$_id"},
+            "equipment_id": {"$toString": "$equipment_id"},
+            "created_at": {"$dateToString": {"date": "$created_at"}},
+            "updated_at": {"$dateToString": {"date": "$updated_at"}},
+        }},
+    ]).to_list(length=None)
 
     return {"documents": docs, "count": len(docs)}
 
 
-@router.post("/{equipment_id}/documents", status_code=status.HTTP_201_CREATED)
-@limiter.limit("10/minute")
-async def upload_equipment_documents(
-    request: Request,
+class DocumentProcessingError(ValueError):
+    """Processing failure with a stable code that is safe to show to clients."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+
+async def _update_embedding_status(db, document_id: ObjectId, embedding_status: str, error: Optional[dict] = None):
+    fields = {"embedding_status": embedding_status, "updated_at": datetime.now(timezone.utc)}
+    if error:
+        fields["embedding_error"] = error
+    await db.documents_metadata.update_one({"_id": document_id}, {"$set": fields})
+
+
+async def _queue_upload_file(
+    db,
+    file: UploadFile,
     equipment_id: str,
-    files: List[UploadFile] = File(...),
-    description: Optional[str] = Form(None),
-):
-    db = get_database()
+    tenant_id: str,
+    description: Optional[str],
+    text_extractor: TextExtractionService,
+    process_pool: Optional[Executor],
+) -> Optional[tuple[dict, Callable[[], Awaitable[None]]]]:
+    """Save one uploaded file and record it with a queued status.
+
+    Returns the serialized document metadata and the job that embeds it, or
+    None if the file was skipped.
+    """
+    temp_file_path = None
 
-    equipment = await db.equipment.find_one({"_id": ObjectId(equipment_id)})
-    if not equipment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Equipment not found"
+    try:
+        original_name = file.filename or "upload.bin"
+        content_type = file.content_type or "application/octet-stream"
+
+        if not text_extractor.is_supported(content_type, original_name):
+            logger.warning(f"Unsupported file format: {content_type}")
+            return None
+
+        # Small files are kept in memory for extraction; larger ones are
+        # streamed to a temp file so memory per upload stays bounded.
+        data = await file.read(IN_MEMORY_EXTRACTION_LIMIT + 1)
+        size = len(data)
+        if size > IN_MEMORY_EXTRACTION_LIMIT:
+            _, ext = os.path.splitext(original_name)
+            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
+                temp_file_path = tmp.name
+                tmp.write(data)
+                data = None
+                while block := await file.read(UPLOAD_READ_BLOCK_SIZE):
+                    tmp.write(block)
+                    size += len(block)
+
+        logger.info(f"Queueing file: {original_name} ({size} bytes)")
+
+        storage_key = f"{tenant_id}/equipment/{equipment_id}/{uuid.uuid4().hex}-{original_name}"
+        now = datetime.now(timezone.utc)
+
+        doc_dict = {
+            "equipment_id": ObjectId(equipment_id),
+            "tenant_id": tenant_id,
+            "file_name": original_name,
+            "content_type": content_type,
+            "size": size,
+            "storage_key": storage_key,
+            "uploaded_by": settings.USER_ID,
+            "description": description,
+            "document_type": "knowledge",
+            "embedding_status": "queued",
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        doc_result = await db.documents_metadata.insert_one(doc_dict)
+        document_id = doc_result.inserted_id
+        logger.info("Document inserted with queued status", document_id=str(document_id))
+
+        job = partial(
+            _process_document,
+            db, document_id, equipment_id, tenant_id, original_name, content_type,
+            data, temp_file_path, text_extractor, process_pool,
         )
-    
-    text_extractor = TextExtractionService()
-    embedding_service = EmbeddingService()
-    tenant_id = equipment.get("tenant_id") or settings.TENANT_ID
+        # The job owns the temp file from here on
+        temp_file_path = None
 
-    created_docs = []
+        doc_dict["_id"] = str(document_id)
+        doc_dict["equipment_id"] = str(doc_dict["equipment_id"])
+        # Convert datetime to ISO format string
+        doc_dict["created_at"] = now.isoformat()
+        doc_dict["updated_at"] = now.isoformat()
+        return doc_dict, job
+
+    except Exception as e:
+        logger.error(f"Error queueing file {file.filename}: {e}", exc_info=True)
+        return None
+
+    finally:
+        _remove_temp_file(temp_file_path)
 
-    for file in files:
-        try:
-            data = await file.read()
-            size = len(data)
-            original_name = file.filename or "upload.bin"
-            content_type = file.content_type or "application/octet-stream"
-
-            logger.info(f"Processing file: {original_name} ({size} bytes)")
-
-            if not text_extractor.is_supported(content_type, original_name):
-                logger.warning(f"Unsupported file format: {content_type}")
-                continue
-
-            temp_file_path = None
-
-            try:
-                _, ext = os.path.splitext(original_name)
-                with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-                    tmp.write(data)
-                    temp_file_path = tmp.name 
-
-                try:
-                    extracted_text = text_extractor.extract_text(temp_file_path, content_type)
-                except ValueError as e:
-                    # Unsupported format
-                    logger.warning(f"Unsupported file format: {original_name} - {str(e)}")
-                    continue
-                except FileNotFoundError as e:
-                    logger.error(f"File not found: {original_name} - {str(e)}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Text extraction failed: {original_name} - {str(e)}")
-                    continue                      
-
-                logger.info(
-                    "Text extracted from document",
-                    file_name=original_name,
-                    text_length=len(extracted_text or ""),
-                )
-
-                if not extracted_text or not extracted_text.strip():
-                    logger.warning(f"EMPTY_DOCUMENT: No text content extracted from {original_name}")
-                    continue
-
-                chunks = embedding_service.split_text(extracted_text)
-                logger.info(
-                    "Document text split into chunks",
-                    file_name=original_name,
-                    chunk_count=len(chunks),
-                )
-
-                if not chunks:
-                    raise ValueError("NO_CHUNKS: Text splitting resulted in no chunks")
-                
-
-                storage_key = f"{tenant_id}/equipment/{equipment_id}/{uuid.uuid4().hex}-{original_name}"
-                now = datetime.utcnow()
-
-                doc_dict = {
-                    "equipment_id": ObjectId(equipment_id),
-                    "tenant_id": tenant_id,
-                    "file_name": original_name,
-                    "content_type": content_type,
-                    "size": size,
-                    "storage_key": storage_key,
-                    "uploaded_by": settings.USER_ID,
-                    "description": description,
-                    "document_type": "knowledge",
-                    "embedding_status": "processing",
-                    "created_at": now,
-                    "updated_at": now,
-                }
-
-                doc_result = await db.documents_metadata.insert_one(doc_dict)
-                document_id = doc_result.inserted_id
-                logger.info("Document inserted with processing status", document_id=str(document_id))
-
-                chunk_documents = []
-
-                for index, chunk_text in enumerate(chunks):
-
-                    try:
-                        embedding_vector = embedding_service.embed_text(chunk_text)
-
-                        chunk_doc = {
-                            "document_id": document_id,
-                            "equipment_id": ObjectId(equipment_id),
-                            "tenant_id": tenant_id,
-                            "file_name": original_name,
-                            "chunk_id": str(uuid.uuid4()),
-                            "chunk_index": index,
-                            "text": chunk_text,
-                            "embedding": embedding_vector,
-                            "is_disabled": False,
-                        }
-
-                        chunk_documents.append(chunk_doc)
-
-                        if (index + 1) % 10 == 0 or index == len(chunks) - 1:
-                            logger.debug(
-                                "Chunk embedding progress",
-                                document_id=str(document_id),
-                                chunks_embedded=index + 1,
-                                total_chunks=len(chunks),
-                            )
-
-                    except Exception as e:
-                        # If embedding fails for a specific chunk, log but continue
-                        logger.warning(
-                            "Failed to embed chunk",
-                            document_id=str(document_id),
-                            chunk_index=index,
-                            error=str(e),
-                            error_type=type(e).__name__,
-                        )
-                        continue
-
-                if not chunk_documents:
-                    # Update document status to failed
-                    await db.documents_metadata.update_one(
-                        {"_id": document_id},
-                        {
-                            "$set": {
-                                "embedding_status": "failed",
-                                "embedding_error": {
-                                    "message": "Failed to generate embeddings for all chunks",
-                                },
-                                "updated_at": datetime.utcnow()
-                            }
-                        }
-                    )
-                    raise Exception("EMBEDDING_FAILED: Failed to generate embeddings for all chunks")
-                
-                await db[settings.DOCUMENT_CHUNKS_COLLECTION].insert_many(chunk_documents)
-                logger.info(
-                    "Chunks inserted into database",
-                    document_id=str(document_id),
-                    chunks_inserted=len(chunk_documents),
-                )
-
-                await db.documents_metadata.update_one(
-                    {"_id": document_id},
-                    {
-                        "$set": {
-                            "embedding_status": "completed",
-                            "updated_at": datetime.utcnow()
-                        }
-                    }
-                )
-
-                logger.info(
-                    "Document embedding completed",
-                    document_id=str(document_id),
-                    chunks_created=len(chunk_documents),
-                    total_chunks=len(chunks),
-                )
-
-                doc_dict["_id"] = str(document_id)
-                doc_dict["equipment_id"] = str(doc_dict["equipment_id"])
-                # Convert datetime to ISO format string
-                if isinstance(doc_dict.get("created_at"), datetime):
-                    doc_dict["created_at"] = doc_dict["created_at"].isoformat()
-                if isinstance(doc_dict.get("updated_at"), datetime):
-                    doc_dict["updated_at"] = doc_dict["updated_at"].isoformat()
-                created_docs.append(doc_dict)
-
-                logger.success(f"Successfully processed {original_name}")
-
-            finally:
-                # Clean up temp file
-                if temp_file_path and os.path.exists(temp_file_path):
-                    try:
-                        os.remove(temp_file_path)
-                    except Exception as e:
-                        logger.warning(f"Failed to delete temp file: {e}")
 
+def _remove_temp_file(temp_file_path: Optional[str]):
+    if temp_file_path and os.path.exists(temp_file_path):
+        try:
+            os.remove(temp_file_path)
         except Exception as e:
-            logger.error(f"Error processing file {file.filename}: {e}", exc_info=True)
-            continue
+            logger.warning(f"Failed to delete temp file: {e}")
 
-    return {"documents": created_docs, "count": len(created_docs)}
 
+async def _process_document(
+    db,
+    document_id: ObjectId,
+    equipment_id: str,
+    tenant_id: str,
+    original_name: str,
+    content_type: str,
+    data: Optional[bytes],
+    temp_file_path: Optional[str],
+    text_extractor: TextExtractionService,
+    process_pool: Optional[Executor],
+):
+    """Extract, chunk, embed and store a queued document.
+
+    Progress is reported through the document's embedding_status.
+    """
+    equipment_obj_id = ObjectId(equipment_id)
+    chunks_collection = db[settings.DOCUMENT_CHUNKS_COLLECTION]
+    chunks_inserted = 0
 
+    try:
+        await _update_embedding_status(db, document_id, "processing")
+
+        if temp_file_path:
+            extract_call = (text_extractor.extract_text, temp_file_path, content_type)
+        else:
+            extract_call = (text_extractor.extract_text_from_bytes, data, content_type, original_name)
+        extracted_text = await asyncio.get_running_loop().run_in_executor(process_pool, *extract_call)
+
+        logger.info(
+            "Text extracted from document",
+            file_name=original_name,
+            text_length=len(extracted_text or ""),
+        )
 
+        if not extracted_text or not extracted_text.strip():
+            raise DocumentProcessingError("EMPTY_DOCUMENT", "No text content extracted")
 
+        # Splitting and embedding are CPU work; keep them off the event loop
+        chunks = await asyncio.to_thread(embedding_service.split_text, extracted_text)
+        logger.info(
+            "Document text split into chunks",
+            file_name=original_name,
+            chunk_count=len(chunks),
+        )
 
+        if not chunks:
+            raise DocumentProcessingError("NO_CHUNKS", "Text splitting resulted in no chunks")
+
+        embedding_vectors = await asyncio.to_thread(embedding_service.embed_texts_np, chunks, use_cache=False)
+
+        chunk_documents = []
+        for index, (chunk_text, embedding_vector) in enumerate(zip(chunks, embedding_vectors)):
+            chunk_documents.append({
+                "document_id": document_id,
+                "equipment_id": equipment_obj_id,
+                "tenant_id": tenant_id,
+                "file_name": original_name,
+                "chunk_id": str(uuid.uuid4()),
+                "chunk_index": index,
+                "text": chunk_text,
+                # float32 BSON vector: ~6 KB per chunk instead of a ~20 KB array of doubles
+                "embedding": Binary.from_vector(embedding_vector, BinaryVectorDtype.FLOAT32),
+                "is_disabled": False,
+            })
+
+        if not chunk_documents:
+            raise DocumentProcessingError("EMBEDDING_FAILED", "Failed to generate embeddings for all chunks")
+
+        for start in range(0, len(chunk_documents), CHUNK_INSERT_BATCH_SIZE):
+            batch = chunk_documents[start:start + CHUNK_INSERT_BATCH_SIZE]
+            # Counted before the insert: a failed unordered batch may be partly written
+            chunks_inserted += len(batch)
+            await chunks_collection.insert_many(batch, ordered=False)
+        logger.info(
+            "Chunks inserted into database",
+            document_id=str(document_id),
+            chunks_inserted=len(chunk_documents),
+        )
 
+        await _update_embedding_status(db, document_id, "completed")
+        # Questions asked while the document was processing must see its chunks
+        get_rag_service().invalidate(equipment_id)
 
+        logger.success(f"Successfully processed {original_name}")
 
+    except Exception as e:
+        logger.error(f"Error processing file {original_name}: {e}", exc_info=True)
+        # Clients only see a stable code; details such as temp file paths stay in the logs
+        if isinstance(e, DocumentProcessingError):
+            error = {"code": e.code, "message": e.message}
+        else:
+            error = {"code": "PROCESSING_FAILED", "message": "The document could not be processed"}
+        try:
+            if chunks_inserted:
+                # Drop chunks of the batches that made it in before the failure
+                await chunks_collection.delete_many({"equipment_id": equipment_obj_id, "document_id": document_id})
+                get_rag_service().invalidate(equipment_id)
+            await _update_embedding_status(db, document_id, "failed", error=error)
+        except Exception as update_error:
+            logger.error(f"Failed to mark document {document_id} as failed: {update_error}")
 
+    finally:
+        _remove_temp_file(temp_file_path)
 
 
+async def _run_document_jobs(jobs: List[Callable[[], Awaitable[None]]]):
+    await asyncio.gather(*(job() for job in jobs))
 
 
+@router.post("/{equipment_id}/documents", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("10/minute")
+async def upload_equipment_documents(
+    request: Request,
+    equipment_id: str,
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    description: Optional[str] = Form(None),
+):
+    """Accept documents for an equipment and embed them in the background.
 
-@router.get("/{equipment_id}/documents", status_code=status.HTTP_200_OK)
-async def list_equipment_documents(equipment_id: str):
-    """List all documents for an equipment"""
+    Poll the document status endpoint for embedding_status.
+    """
     db = get_database()
-    
-    # Verify equipment exists
+
     equipment = await db.equipment.find_one({"_id": ObjectId(equipment_id)})
     if not equipment:
         raise HTTPException(
@@ -386,23 +409,55 @@ async def list_equipment_documents(equipment_id: str):
             detail="Equipment not found"
         )
     
-    documents = await db.documents_metadata.find({
-        "equipment_id": ObjectId(equipment_id),
-        "is_disabled": {"$ne": True}
-    }).to_list(length=1000)
-    
-    # Convert ObjectId and datetime fields to strings for JSON serialization
-    serialized_documents = []
-    for doc in documents:
-        doc_dict = dict(doc)
-        if '_id' in doc_dict and isinstance(doc_dict['_id'], ObjectId):
-            doc_dict['_id'] = str(doc_dict['_id'])
-        if 'equipment_id' in doc_dict and isinstance(doc_dict['equipment_id'], ObjectId):
-            doc_dict['equipment_id'] = str(doc_dict['equipment_id'])
-        if 'created_at' in doc_dict and isinstance(doc_dict['created_at'], datetime):
-            doc_dict['created_at'] = doc_dict['created_at'].isoformat()
-        if 'updated_at' in doc_dict and isinstance(doc_dict['updated_at'], datetime):
-            doc_dict['updated_at'] = doc_dict['updated_at'].isoformat()
-        serialized_documents.append(doc_dict)
-    
-    return {"documents": serialized_documents, "count": len(serialized_documents)}
\ No newline at end of file
+    text_extractor = TextExtractionService()
+    tenant_id = equipment.get("tenant_id") or settings.TENANT_ID
+
+    # Text extraction runs in the app's process pool when one is configured
+    process_pool = getattr(request.app.state, "process_pool", None)
+
+    results = await asyncio.gather(*[
+        _queue_upload_file(
+            db, file, equipment_id, tenant_id, description,
+            text_extractor, process_pool,
+        )
+        for file in files
+    ])
+    queued = [result for result in results if result is not None]
+
+    # One background task processes all files of this upload concurrently
+    if queued:
+        background_tasks.add_task(_run_document_jobs, [job for _, job in queued])
+
+    created_docs = [doc for doc, _ in queued]
+    return {"documents": created_docs, "count": len(created_docs)}
+
+
+@router.get("/{equipment_id}/documents/{document_id}/status", status_code=status.HTTP_200_OK)
+async def get_document_status(equipment_id: str, document_id: str):
+    """Get the embedding status of an uploaded document"""
+    db = get_database()
+
+    try:
+        equipment_obj_id = ObjectId(equipment_id)
+        document_obj_id = ObjectId(document_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid equipment_id or document_id format"
+        )
+
+    doc = await db.documents_metadata.find_one(
+        {"_id": document_obj_id, "equipment_id": equipment_obj_id},
+        {"embedding_status": 1, "embedding_error": 1},
+    )
+    if not doc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+
+    return {
+        "document_id": document_id,
+        "embedding_status": doc.get("embedding_status"),
+        "embedding_error": doc.get("embedding_error"),
+    }
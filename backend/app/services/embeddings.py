@@ -1,54 +1,87 @@
+from functools import lru_cache
 from typing import List
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 import numpy as np
 from app.config import settings
 import hashlib
 
+
+def _seeded_vector(text: str, dim: int) -> np.ndarray:
+    """Raw (unnormalized) hash-seeded vector for a text."""
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+    vector = np.random.default_rng(seed).standard_normal(dim, dtype=np.float32)
+    vector.setflags(write=False)
+    return vector
+
+
+# Query vectors only: document chunks are seldom embedded twice and would evict them
+_hash_vector = lru_cache(maxsize=settings.EMBEDDING_CACHE_SIZE)(_seeded_vector)
+
+
+_TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=settings.CHUNK_SIZE,
+    chunk_overlap=settings.CHUNK_OVERLAP,
+    length_function=len,
+    is_separator_regex=False,
+)
+
+
 class EmbeddingService:
 
     def __init__(self):
         # Mock embedding service using deterministic hash-based vectors
         # This ensures consistent embeddings for the same text
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP,
-            length_function=len,
-            is_separator_regex=False,
-        )
+        self.text_splitter = _TEXT_SPLITTER
         self.embedding_dim = 1536  # Standard embedding dimension     
 
     def split_text(self, text:str)->List[str]:
         if not text or not text.strip():
             return []
         
+        # Drop whitespace-only chunks so they line up with embed_texts output
         chunks = self.text_splitter.split_text(text)
-        return chunks
+        return [chunk for chunk in chunks if chunk.strip()]
 
     def embed_text(self,text:str)->List[float]:
         if not text or not text.strip():
             raise ValueError("Cannot embed empty text")
-        
-        # Generate deterministic hash-based embedding
-        hash_object = hashlib.sha256(text.encode())
-        hex_dig = hash_object.hexdigest()
-        
-        # Convert hash to float values
-        np.random.seed(int(hex_dig[:8], 16))
-        embedding = np.random.normal(0, 1, self.embedding_dim)
-        
-        # Normalize the embedding
-        embedding = embedding / np.linalg.norm(embedding)
-        
-        return embedding.tolist()
+
+        return self.embed_texts([text])[0]
 
     def embed_texts(self,texts:List[str])->List[List[float]]:
-        if not texts:
-            return []
-        
+        return self.embed_texts_np(texts).tolist()
+
+    def embed_texts_np(self,texts:List[str],use_cache:bool=True)->np.ndarray:
+        """Embed texts into an (N, embedding_dim) float32 array.
+
+        Pass use_cache=False for bulk document chunks so they do not evict
+        cached query vectors.
+        """
         # Filter out empty texts
-        valid_texts = [t for t in texts if t and t.strip()]
-        if not valid_texts:
-            return []
-        
-        embeddings = [self.embed_text(text) for text in valid_texts]
-        return embeddings
+        valid_texts = [t for t in texts if t and t.strip()] if texts else []
+
+        # Repeated texts (headers, footers, boilerplate) are embedded once
+        row_of = {}
+        rows = [row_of.setdefault(t, len(row_of)) for t in valid_texts]
+
+        # Generate deterministic hash-based embeddings into one array
+        embeddings = np.empty((len(row_of), self.embedding_dim), dtype=np.float32)
+        if not row_of:
+            return embeddings
+        vector_for = _hash_vector if use_cache else _seeded_vector
+        for text, i in row_of.items():
+            embeddings[i] = vector_for(text, self.embedding_dim)
+
+        # Normalize all rows at once
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        if len(row_of) == len(rows):
+            return embeddings
+        return embeddings[rows]
+
+    def warm_cache(self,texts:List[str])->int:
+        """Embed texts ahead of time so later calls hit the embedding cache."""
+        return len(self.embed_texts_np(texts))
+
+
+embedding_service = EmbeddingService()
@@ -1,22 +1,82 @@
 import asyncio
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
 from bson import ObjectId
+from bson.binary import Binary, BinaryVectorDtype
 from loguru import logger
 from pydantic import BaseModel, Field
 
 from app.database import get_database
-from app.services.embeddings import EmbeddingService
+from app.services.embeddings import embedding_service as embeddings_service
 from app.config import settings
 from app.models.rag import ChunkContent, ChunkMetadata, RetrievalMetadata, RetrievalResult
 
 
+# Result projections are the same for every query, so build them once.
+_PROJECT_STAGE_NO_TEXT: dict[str, Any] = {
+    "$project": {
+        "_id": 1,
+        "chunk_id": 1,
+        "document_id": 1,
+        "file_name": 1,
+        "chunk_index": 1,
+        "equipment_id": 1,
+        "tenant_id": 1,
+        "score": {"$meta": "vectorSearchScore"},
+    }
+}
+_PROJECT_STAGE: dict[str, Any] = {"$project": {**_PROJECT_STAGE_NO_TEXT["$project"], "text": 1}}
 
 
-embeddings_service = EmbeddingService()
+class RetrievalCache:
+    """In-memory LRU cache of retrieval results with a per-entry TTL"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, RetrievalResult]] = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[RetrievalResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def set(self, key: tuple, result: RetrievalResult) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def evict(self, predicate: Callable[[tuple], bool]) -> int:
+        """Drop every entry whose key matches predicate; returns how many were dropped."""
+        stale = [key for key in self._entries if predicate(key)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
 
 class RAGService:
     def __init__(self, index_name: str = None):
         self.index_name = index_name or settings.VECTOR_INDEX_NAME
+        self.cache = RetrievalCache(
+            maxsize=settings.RAG_CACHE_SIZE,
+            ttl_seconds=settings.RAG_CACHE_TTL_SECONDS,
+        )
+        self._pending: dict[tuple, asyncio.Task] = {}
+        # Bumped by invalidate() so searches already in flight are not cached
+        self._generation = 0
         logger.debug("RAGService initialized", index_name=self.index_name)
 
     async def retrieve(
@@ -26,6 +86,72 @@ class RAGService:
         equipment_id: str | None = None,
         tenant_id: str | None = None,
         extra_filters: dict[str, Any] | None = None,
+        include_text: bool = True,
+    ) -> RetrievalResult:
+        """Vector-search chunks for a query.
+
+        With include_text=False only chunk metadata is fetched and `data` is
+        left empty, for callers that just need ids and scores.
+        """
+        # Results depending on ad-hoc filters are neither cached nor shared.
+        if extra_filters:
+            return await self._search(query, k, equipment_id, tenant_id, extra_filters, include_text)
+
+        key = (tenant_id, equipment_id, k, query, include_text)
+        if settings.RAG_CACHE_SIZE > 0:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug(f"Retrieval cache hit for query: '{query[:50]}...'")
+                return cached
+
+        # Concurrent callers asking the same question share one vector search.
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._search(query, k, equipment_id, tenant_id, include_text=include_text)
+            )
+            self._pending[key] = task
+            generation = self._generation
+            task.add_done_callback(lambda done: self._finish_pending(key, generation, done))
+        else:
+            logger.debug(f"Joining in-flight retrieval for query: '{query[:50]}...'")
+
+        return await asyncio.shield(task)
+
+    def _finish_pending(self, key: tuple, generation: int, task: asyncio.Task) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        # Empty results are not cached: the documents may still be embedding
+        result = task.result()
+        if settings.RAG_CACHE_SIZE > 0 and generation == self._generation and result.metadata.chunks_retrieved:
+            self.cache.set(key, result)
+
+    def invalidate(self, equipment_id: str) -> int:
+        """Forget cached results that may include chunks of an equipment.
+
+        Call when its chunks change (document embedded, equipment deleted).
+        Results not scoped to one equipment are dropped too. The cache is per
+        process, so other workers still serve entries until their TTL expires.
+        """
+        self._generation += 1
+        self._pending.clear()
+        return self.cache.evict(lambda key: key[1] in (equipment_id, None))
+
+    @staticmethod
+    def _compute_candidate_k(k: int) -> int:
+        """Number of nearest-neighbour candidates to score for the top k."""
+        return max(k * 10, 100)
+
+    async def _search(
+        self,
+        query: str,
+        k: int,
+        equipment_id: str | None,
+        tenant_id: str | None,
+        extra_filters: dict[str, Any] | None = None,
+        include_text: bool = True,
     ) -> RetrievalResult:
         db = get_database()
         collection = db[settings.DOCUMENT_CHUNKS_COLLECTION]
@@ -44,68 +170,49 @@ class RAGService:
                 logger.error(f"Failed to generate query embedding: {e}")
                 raise
 
-            # Atlas Search `knnBeta` cannot be nested (e.g., inside compound).
-            # Instead:
-            # 1) Run `$search` with top-level `knnBeta`.
-            # 2) Apply normal MongoDB `$match` filters after `$search`.
-            # NOTE:
-            # We apply equipment/tenant constraints in a later $match stage.
-            # If knnBeta only returns k neighbors globally, post-filtering can
-            # drop all results even when relevant chunks exist for the target equipment.
-            # Over-fetch neighbors to improve recall before filtering.
-            search_k = max(k * 20, 100)
+            # `$vectorSearch` applies the filter before scoring, so candidates
+            # from other equipment/tenants never crowd out the ones we want.
+            # Every filtered field must be declared as a "filter" field in the
+            # Atlas vector index (equipment_id, tenant_id, is_disabled).
+            num_candidates = self._compute_candidate_k(k)
 
-            vector_query: dict[str, Any] = {
-                "$search": {
-                    "index": self.index_name,
-                    "knnBeta": {
-                        "vector": query_embedding,
-                        "path": "embedding",
-                        "k": search_k,
-                    },
-                }
-            }
-
-            match_filters: dict[str, Any] = {
+            search_filter: dict[str, Any] = {
                 "is_disabled": {"$ne": True},
             }
 
             if equipment_id:
                 try:
-                    match_filters["equipment_id"] = ObjectId(equipment_id)
+                    search_filter["equipment_id"] = ObjectId(equipment_id)
                     logger.debug(f"Added equipment_id filter: {equipment_id}")
                 except Exception as e:
                     logger.warning(f"Invalid equipment_id '{equipment_id}'; skipping filter. Error: {e}")
 
             if tenant_id:
-                match_filters["tenant_id"] = tenant_id
+                search_filter["tenant_id"] = tenant_id
                 logger.debug(f"Added tenant_id filter: {tenant_id}")
 
             if extra_filters:
-                match_filters.update(extra_filters)
+                search_filter.update(extra_filters)
                 logger.debug(f"Added extra filters: {extra_filters}")
 
+            vector_query: dict[str, Any] = {
+                "$vectorSearch": {
+                    "index": self.index_name,
+                    "path": "embedding",
+                    "queryVector": Binary.from_vector(query_embedding, BinaryVectorDtype.FLOAT32),
+                    "numCandidates": num_candidates,
+                    "limit": k,
+                    "filter": search_filter,
+                }
+            }
+
             pipeline = [
                 vector_query,
-                {"$match": match_filters},
-                {
-                    "$project": {
-                        "_id": 1,
-                        "chunk_id": 1,
-                        "document_id": 1,
-                        "file_name": 1,
-                        "text": 1,
-                        "chunk_index": 1,
-                        "equipment_id": 1,
-                        "tenant_id": 1,
-                        "score": {"$meta": "searchScore"},
-                    }
-                },
-                {"$limit": k},
+                _PROJECT_STAGE if include_text else _PROJECT_STAGE_NO_TEXT,
             ]
 
             try:
-                logger.debug(f"Executing vector search with index: {self.index_name}, search_k={search_k}, final_k={k}")
+                logger.debug(f"Executing vector search with index: {self.index_name}, num_candidates={num_candidates}, k={k}")
                 cursor = collection.aggregate(pipeline)
                 results = await cursor.to_list(length=k)
                 logger.info(f"Retrieved {len(results)} results from vector search")
@@ -118,11 +225,12 @@ class RAGService:
 
             try:
                 for res in results:
-                    chunk_data.append(ChunkContent(
-                        text=res.get("text", ""),
-                        file_name=res.get("file_name"),
-                        score=res.get("score"),
-                    ))
+                    if include_text:
+                        chunk_data.append(ChunkContent(
+                            text=res.get("text", ""),
+                            file_name=res.get("file_name"),
+                            score=res.get("score"),
+                        ))
 
                     chunk_metadata.append(ChunkMetadata(
                         chunk_id=res.get("chunk_id", ""),
@@ -134,7 +242,7 @@ class RAGService:
                         file_name=res.get("file_name", ""),
                     ))
 
-                    logger.success(f"Successfully processed {len(chunk_data)} chunks")
+                    logger.success(f"Successfully processed {len(chunk_metadata)} chunks")
 
             except Exception as e:
                 logger.error(f"Failed to process search results: {e}")
@@ -145,7 +253,7 @@ class RAGService:
                 metadata=RetrievalMetadata(
                     query=query,
                     k=k,
-                    chunks_retrieved=len(chunk_data),
+                    chunks_retrieved=len(results),
                     equipment_id=equipment_id,
                     tenant_id=tenant_id,
                     chunks=chunk_metadata,
@@ -159,5 +267,12 @@ class RAGService:
             raise
 
 
+_rag_service: Optional[RAGService] = None
+
 
-            
\ No newline at end of file
+def get_rag_service() -> RAGService:
+    """Get the shared RAGService instance, creating it on first use"""
+    global _rag_service
+    if _rag_service is None:
+        _rag_service = RAGService()
+    return _rag_service
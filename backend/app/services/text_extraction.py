@@ -1,4 +1,6 @@
+import io
 import os
+from typing import BinaryIO, Union
 from pypdf import PdfReader
 from docx import Document as DocxDocument
 
@@ -15,19 +17,24 @@ class TextExtractionService:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        extension = self._get_extension(file_path)
-        
+        return self._extract(file_path, content_type, self._get_extension(file_path))
+
+    def extract_text_from_bytes(self, data: bytes, content_type: str, file_name: str = "") -> str:
+        """Extract text from an in-memory upload without writing it to disk"""
+        return self._extract(io.BytesIO(data), content_type, self._get_extension(file_name))
+
+    def _extract(self, source: Union[str, BinaryIO], content_type: str, extension: str) -> str:
         # Plain text files (.txt, .md)
         if content_type in ['text/plain', 'text/markdown'] or extension in ['txt', 'md']:
-            return self._extract_text_file(file_path)
+            return self._extract_text_file(source)
         
         # PDF files
         elif content_type == 'application/pdf' or extension == 'pdf':
-            return self._extract_pdf(file_path)
+            return self._extract_pdf(source)
         
         # Word documents (.docx)
         elif 'wordprocessingml' in content_type or extension == 'docx':
-            return self._extract_docx(file_path)
+            return self._extract_docx(source)
         
         else: 
             raise ValueError(
@@ -36,23 +43,27 @@ class TextExtractionService:
             )
 
 
-    def _extract_text_file(self, file_path: str) -> str:
+    def _extract_text_file(self, source: Union[str, BinaryIO]) -> str:
         """Extract text from plain text files"""
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                data = f.read()
+        else:
+            data = source.read()
+
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            return text.strip()
+            text = data.decode('utf-8')
         except UnicodeDecodeError:
             # Try with different encoding
-            with open(file_path, 'r', encoding='latin-1') as f:
-                text = f.read()
-            return text.strip()
+            text = data.decode('latin-1')
+        # Normalize newlines the way text-mode open() does
+        return text.replace('\r\n', '\n').replace('\r', '\n').strip()
         
 
-    def _extract_pdf(self, file_path: str) -> str:
+    def _extract_pdf(self, source: Union[str, BinaryIO]) -> str:
         """Extract text from PDF files using pypdf"""
         try:
-            reader = PdfReader(file_path)
+            reader = PdfReader(source)
             text_parts = []
             
             for page in reader.pages:
@@ -65,10 +76,10 @@ class TextExtractionService:
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
-    def _extract_docx(self, file_path: str) -> str:
+    def _extract_docx(self, source: Union[str, BinaryIO]) -> str:
         """Extract text from Word documents (.docx)"""
         try:
-            doc = DocxDocument(file_path)
+            doc = DocxDocument(source)
             text_parts = []
             
             # Extract text from paragraphs
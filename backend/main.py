@@ -3,13 +3,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 from loguru import logger
 import structlog
+import multiprocessing
 import sys
 import os
 
+from app.config import settings
 from app.database import connect_to_mongo, close_mongo_connection
 from app.routers import equipment
+from app.services.embeddings import embedding_service
 from app.routers import stream
 from app.middleware.logging import configure_logging, RequestLoggingMiddleware
 from app.middleware.rate_limit import limiter, _rate_limit_exceeded_handler, RateLimitExceeded
@@ -33,9 +37,19 @@ async def lifespan(app: FastAPI):
     
     structlog_logger.info("app_starting", service="voice_ai_knowledge_base")
     await connect_to_mongo()
+    if settings.CACHE_WARM_QUERIES:
+        warmed = embedding_service.warm_cache(settings.CACHE_WARM_QUERIES)
+        structlog_logger.info("embedding_cache_warmed", queries=warmed)
+    # CPU-bound text extraction for uploads runs here. Workers come from a
+    # forkserver rather than fork() of this multi-threaded, model-laden process.
+    app.state.process_pool = ProcessPoolExecutor(
+        max_workers=settings.EXTRACTION_WORKERS,
+        mp_context=multiprocessing.get_context("forkserver"),
+    )
     yield
     # Shutdown
     structlog_logger.info("app_shutting_down")
+    app.state.process_pool.shutdown(wait=False, cancel_futures=True)
     await close_mongo_connection()
 
 
@@ -126,4 +140,11 @@ async def generic_exception_handler(request: Request, exc: Exception):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        ws_max_size=settings.WS_MAX_SIZE,
+        ws_max_queue=settings.WS_MAX_QUEUE,
+    )
\ No newline at end of file
@@ -1,20 +1,22 @@
 """Pytest configuration and fixtures."""
-import pytest
 import asyncio
+import pytest
+import pytest_asyncio
 from typing import AsyncGenerator
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from main import app
 from app.config import settings
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop, as the server does, where it is installed."""
+    try:
+        import uvloop
+    except ImportError:  # uvloop is not available on Windows
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
 
 
 @pytest.fixture
@@ -30,10 +32,12 @@ async def test_db():
     client.close()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def client() -> AsyncGenerator[AsyncClient, None]:
-    """Create an async HTTP client for testing."""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    """Create one async HTTP client shared by the whole test session."""
+    # Unhandled errors come back as 500 responses, as they would from a server
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
 
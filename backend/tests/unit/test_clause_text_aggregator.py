@@ -0,0 +1,54 @@
+"""Unit tests for the clause-level TTS text aggregator."""
+from app.bot import ClauseTextAggregator
+
+# Inputs avoid ".", "!" and "?": confirming those sentence ends loads NLTK punkt data.
+
+
+async def _aggregate(text: str) -> tuple[list[str], ClauseTextAggregator]:
+    """Feed text through a fresh aggregator and collect what it releases."""
+    aggregator = ClauseTextAggregator()
+    released = [aggregation.text async for aggregation in aggregator.aggregate(text)]
+    return released, aggregator
+
+
+async def test_flushes_long_clauses_at_clause_punctuation():
+    """Test that a clause of at least four words is released at , ; or :"""
+    for mark in (",", ";", ":"):
+        released, _ = await _aggregate(f"Open the main supply valve{mark} then wait")
+
+        assert released == [f"Open the main supply valve{mark}"], mark
+
+
+async def test_keeps_short_clauses_together():
+    """Test that clauses under four words are not released on their own."""
+    released, aggregator = await _aggregate("Yes, it is ready")
+
+    assert released == []
+    assert (await aggregator.flush()).text == "Yes, it is ready"
+
+
+async def test_does_not_split_numbers_or_times():
+    """Test that punctuation inside "1,000" or "10:30" is not a clause boundary."""
+    released, aggregator = await _aggregate("Set it to 1,000 rpm at 10:30 each day")
+
+    assert released == []
+    assert (await aggregator.flush()).text == "Set it to 1,000 rpm at 10:30 each day"
+
+
+async def test_caps_clauses_without_punctuation():
+    """Test that text without punctuation is released every MAX_WORDS words."""
+    words = [f"word{i}" for i in range(ClauseTextAggregator.MAX_WORDS + 5)]
+
+    released, aggregator = await _aggregate(" ".join(words) + " ")
+
+    assert released == [" ".join(words[:ClauseTextAggregator.MAX_WORDS])]
+    assert (await aggregator.flush()).text == " ".join(words[ClauseTextAggregator.MAX_WORDS:])
+
+
+async def test_flush_returns_remainder():
+    """Test that flush() returns the text after the last released clause."""
+    released, aggregator = await _aggregate("When the pressure drops below zero, shut it")
+
+    assert released == ["When the pressure drops below zero,"]
+    assert (await aggregator.flush()).text == "shut it"
+    assert await aggregator.flush() is None
@@ -0,0 +1,51 @@
+"""Unit tests for the embedding service."""
+import numpy as np
+
+from app.services.embeddings import EmbeddingService, _hash_vector
+
+
+def test_embed_texts_matches_embed_text():
+    """Batch embedding should give the same vectors as single-text embedding."""
+    service = EmbeddingService()
+    texts = ["pump pressure", "valve maintenance", "pump pressure"]
+
+    batch = service.embed_texts(texts)
+
+    assert len(batch) == 3
+    assert batch[0] == batch[2]
+    for text, vector in zip(texts, batch):
+        assert np.allclose(vector, service.embed_text(text))
+        assert np.isclose(np.linalg.norm(vector), 1.0)
+
+
+def test_embed_texts_skips_empty_texts():
+    """Empty or whitespace-only texts should not be embedded."""
+    service = EmbeddingService()
+
+    assert service.embed_texts(["", "   "]) == []
+    assert len(service.embed_texts(["", "hello"])) == 1
+
+
+def test_embed_text_reuses_cached_vectors():
+    """Repeated texts should be served from the embedding cache."""
+    service = EmbeddingService()
+    _hash_vector.cache_clear()
+
+    first = service.embed_text("how does the pump work")
+    second = service.embed_text("how does the pump work")
+
+    assert first == second
+    assert _hash_vector.cache_info().hits == 1
+
+
+def test_embed_texts_np_without_cache_keeps_query_cache():
+    """Bulk chunk embedding should neither read nor fill the query cache."""
+    service = EmbeddingService()
+    _hash_vector.cache_clear()
+    service.warm_cache(["how does the pump work"])
+
+    chunks = service.embed_texts_np(["pump manual section", "how does the pump work"], use_cache=False)
+
+    info = _hash_vector.cache_info()
+    assert (info.hits, info.currsize) == (0, 1)
+    assert np.allclose(chunks[1], service.embed_text("how does the pump work"))
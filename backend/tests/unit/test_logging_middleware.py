@@ -0,0 +1,39 @@
+"""Unit tests for the request logging middleware."""
+import pytest
+from unittest.mock import MagicMock
+from httpx import AsyncClient
+
+from app.routers import equipment as equipment_router
+
+# Share the session event loop with the session-scoped client fixture
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_echoes_incoming_trace_id(client: AsyncClient):
+    """Test that a caller's X-Trace-ID is returned unchanged."""
+    response = await client.get("/health", headers={"X-Trace-ID": "caller-trace-1"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Trace-ID"] == "caller-trace-1"
+
+
+async def test_generates_trace_id_when_absent(client: AsyncClient):
+    """Test that each request without X-Trace-ID gets a fresh one."""
+    first = await client.get("/health")
+    second = await client.get("/health")
+
+    assert first.headers["X-Trace-ID"]
+    assert second.headers["X-Trace-ID"]
+    assert first.headers["X-Trace-ID"] != second.headers["X-Trace-ID"]
+
+
+async def test_trace_id_reaches_exception_handler(client: AsyncClient, monkeypatch):
+    """Test that the 500 handler reports the request's trace_id."""
+    db = MagicMock()
+    db.equipment.aggregate.side_effect = RuntimeError("database unavailable")
+    monkeypatch.setattr(equipment_router, "get_database", lambda: db)
+
+    response = await client.get("/api/v1/equipment/", headers={"X-Trace-ID": "caller-trace-500"})
+
+    assert response.status_code == 500
+    assert response.json()["trace_id"] == "caller-trace-500"
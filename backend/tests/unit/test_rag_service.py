@@ -1,75 +1,182 @@
 """Unit tests for RAG service."""
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
 
+from app.config import settings
+from app.services import rag
 from app.services.rag import RAGService
 
+_FIXED_OID = ObjectId("507f1f77bcf86cd799439011")
+_FIXED_DOCUMENT_OID = ObjectId("507f191e810c19729de860ea")
+_SAMPLE_CHUNK = {
+    "_id": _FIXED_OID,
+    "chunk_id": "test-chunk-1",
+    "document_id": _FIXED_DOCUMENT_OID,
+    "equipment_id": _FIXED_OID,
+    "tenant_id": "test_tenant",
+    "text": "Test chunk content",
+    "chunk_index": 0,
+    "file_name": "test.pdf",
+    "score": 0.85,
+}
+_SAMPLE_CHUNK_NO_TEXT = {key: value for key, value in _SAMPLE_CHUNK.items() if key != "text"}
+# Search results as returned by the cursor's to_list; RAGService only reads them
+_SAMPLE_ROWS = [_SAMPLE_CHUNK]
+_SAMPLE_ROWS_NO_TEXT = [_SAMPLE_CHUNK_NO_TEXT]
+# A list, not a tuple: the query vector is encoded with Binary.from_vector
+_FAKE_EMBEDDING = [0.1] * 768
 
-@pytest.mark.asyncio
-async def test_rag_retrieve_with_equipment_filter(test_db, sample_chunk_data):
+
+def _fake_embed(_text):
+    """Stand-in for EmbeddingService.embed_text returning a fixed vector."""
+    return _FAKE_EMBEDDING
+
+
+def _vector_search(pipeline):
+    """Return the $vectorSearch options of an aggregation pipeline."""
+    return pipeline[0]["$vectorSearch"]
+
+
+@pytest.fixture(scope="module")
+def shared_rag_service():
+    """One RAGService for the module; it looks up the database per call."""
+    return RAGService()
+
+
+@pytest.fixture
+def rag_service(shared_rag_service):
+    """The shared RAGService with its retrieval cache emptied for this test."""
+    shared_rag_service.cache.clear()
+    return shared_rag_service
+
+
+@pytest.fixture
+def rag_mocks(monkeypatch):
+    """Mock chunks collection and fixed query embedding wired into the RAG service.
+
+    The collection's aggregate cursor returns no rows unless a test sets
+    `mock_collection.aggregate.return_value.to_list.return_value`.
+    """
+    # RAGService only awaits to_list() on the aggregate cursor
+    mock_cursor = SimpleNamespace(to_list=AsyncMock(return_value=[]))
+    mock_collection = AsyncMock(spec=AsyncIOMotorCollection)
+    # Motor's aggregate() is synchronous and returns the cursor
+    mock_collection.aggregate = MagicMock(return_value=mock_cursor)
+
+    mock_db = {settings.DOCUMENT_CHUNKS_COLLECTION: mock_collection}
+    monkeypatch.setattr(rag, "get_database", lambda: mock_db)
+
+    monkeypatch.setattr(rag.embeddings_service, "embed_text", _fake_embed)
+
+    return mock_collection
+
+
+async def test_rag_retrieve_with_equipment_filter(rag_mocks, rag_service):
     """Test RAG retrieval with equipment_id filter."""
-    # Mock the database collection
-    mock_collection = AsyncMock()
-    mock_cursor = AsyncMock()
-    mock_cursor.to_list = AsyncMock(return_value=[
-        {
-            "_id": ObjectId(),
-            "chunk_id": "test-chunk-1",
-            "document_id": ObjectId(),
-            "equipment_id": ObjectId(),
-            "tenant_id": "test_tenant",
-            "text": "Test chunk content",
-            "chunk_index": 0,
-            "file_name": "test.pdf",
-            "score": 0.85
-        }
-    ])
-    mock_collection.aggregate = AsyncMock(return_value=mock_cursor)
-    
-    with patch('app.services.rag.get_database') as mock_get_db:
-        mock_db = MagicMock()
-        mock_db.__getitem__ = MagicMock(return_value=mock_collection)
-        mock_get_db.return_value = mock_db
-        
-        with patch('app.services.rag.embeddings_service.embed_text') as mock_embed:
-            mock_embed.return_value = [0.1] * 768
-            
-            rag_service = RAGService()
-            result = await rag_service.retrieve(
-                query="test query",
-                k=5,
-                equipment_id=str(ObjectId()),
-                tenant_id="test_tenant"
-            )
-            
-            assert result.metadata.chunks_retrieved == 1
-            assert len(result.data) == 1
-            assert result.data[0].text == "Test chunk content"
-
-
-@pytest.mark.asyncio
-async def test_rag_retrieve_over_fetching():
-    """Test that RAG over-fetches candidates before filtering."""
-    with patch('app.services.rag.get_database') as mock_get_db:
-        mock_collection = AsyncMock()
-        mock_cursor = AsyncMock()
-        mock_cursor.to_list = AsyncMock(return_value=[])
-        mock_collection.aggregate = AsyncMock(return_value=mock_cursor)
-        
-        mock_db = MagicMock()
-        mock_db.__getitem__ = MagicMock(return_value=mock_collection)
-        mock_get_db.return_value = mock_db
-        
-        with patch('app.services.rag.embeddings_service.embed_text') as mock_embed:
-            mock_embed.return_value = [0.1] * 768
-            
-            rag_service = RAGService()
-            await rag_service.retrieve(query="test", k=5)
-            
-            # Verify that aggregate was called
-            call_args = mock_collection.aggregate.call_args[0][0]
-            search_stage = call_args[0]
-            
-            # Should over-fetch (k * 20 = 100 minimum)
-            assert search_stage["$search"]["knnBeta"]["k"] >= 100
+    mock_collection = rag_mocks
+    mock_collection.aggregate.return_value.to_list.return_value = _SAMPLE_ROWS
+
+    result = await rag_service.retrieve(
+        query="test query",
+        k=5,
+        equipment_id=str(_FIXED_OID),
+        tenant_id="test_tenant"
+    )
+
+    assert result.metadata.chunks_retrieved == 1
+    assert len(result.data) == 1
+    assert result.data[0].text == "Test chunk content"
+
+    search_filter = _vector_search(mock_collection.aggregate.call_args[0][0])["filter"]
+    assert search_filter["equipment_id"] == _FIXED_OID
+    assert search_filter["tenant_id"] == "test_tenant"
+    assert search_filter["is_disabled"] == {"$ne": True}
+
+
+def test_rag_candidate_k_over_fetches():
+    """Test that RAG scores more candidates than it returns."""
+    assert RAGService._compute_candidate_k(5) >= 100
+    assert RAGService._compute_candidate_k(50) > 50
+
+
+@pytest.mark.slow
+async def test_rag_retrieve_over_fetching(rag_mocks, rag_service):
+    """Test that the vector search stage over-fetches candidates."""
+    mock_collection = rag_mocks
+
+    await rag_service.retrieve(query="test", k=5)
+
+    # Should consider extra candidates (100 minimum) but return only k
+    vector_search = _vector_search(mock_collection.aggregate.call_args[0][0])
+    assert vector_search["numCandidates"] >= 100
+    assert vector_search["limit"] == 5
+
+
+async def test_rag_retrieve_serves_repeat_queries_from_cache(rag_mocks, rag_service):
+    """Test that identical queries skip the vector search on repeat."""
+    mock_collection = rag_mocks
+    mock_collection.aggregate.return_value.to_list.return_value = _SAMPLE_ROWS
+
+    first = await rag_service.retrieve(query="test", k=5, tenant_id="test_tenant")
+    second = await rag_service.retrieve(query="test", k=5, tenant_id="test_tenant")
+
+    assert second is first
+    assert mock_collection.aggregate.call_count == 1
+
+
+async def test_rag_retrieve_does_not_cache_empty_results(rag_mocks, rag_service):
+    """Test that a query with no matches is searched again next time."""
+    mock_collection = rag_mocks
+
+    await rag_service.retrieve(query="test", k=5)
+    await rag_service.retrieve(query="test", k=5)
+
+    assert mock_collection.aggregate.call_count == 2
+
+
+async def test_rag_invalidate_drops_results_for_equipment(rag_mocks, rag_service):
+    """Test that invalidating an equipment evicts its cached and unscoped results."""
+    mock_collection = rag_mocks
+    mock_collection.aggregate.return_value.to_list.return_value = _SAMPLE_ROWS
+    other_equipment_id = "507f191e810c19729de860eb"
+
+    for equipment_id in (str(_FIXED_OID), other_equipment_id, None):
+        await rag_service.retrieve(query="test", k=5, equipment_id=equipment_id)
+
+    rag_service.invalidate(str(_FIXED_OID))
+    for equipment_id in (str(_FIXED_OID), other_equipment_id, None):
+        await rag_service.retrieve(query="test", k=5, equipment_id=equipment_id)
+
+    # Only the invalidated equipment and the unscoped query are searched again
+    assert mock_collection.aggregate.call_count == 5
+
+
+async def test_rag_retrieve_shares_concurrent_identical_queries(rag_mocks, rag_service):
+    """Test that concurrent identical queries run a single vector search."""
+    mock_collection = rag_mocks
+
+    first, second = await asyncio.gather(
+        rag_service.retrieve(query="test", k=5),
+        rag_service.retrieve(query="test", k=5),
+    )
+
+    assert second is first
+    assert mock_collection.aggregate.call_count == 1
+
+
+async def test_rag_retrieve_without_text(rag_mocks, rag_service):
+    """Test that metadata-only retrieval does not fetch chunk text."""
+    mock_collection = rag_mocks
+    mock_collection.aggregate.return_value.to_list.return_value = _SAMPLE_ROWS_NO_TEXT
+
+    result = await rag_service.retrieve(query="test", k=5, include_text=False)
+
+    project_stage = mock_collection.aggregate.call_args[0][0][1]
+    assert "text" not in project_stage["$project"]
+    assert result.data == []
+    assert result.metadata.chunks_retrieved == 1
+    assert result.metadata.chunks[0].chunk_id == "test-chunk-1"
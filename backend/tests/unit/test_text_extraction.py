@@ -0,0 +1,25 @@
+"""Unit tests for the text extraction service."""
+import pytest
+
+from app.services.text_extraction import TextExtractionService
+
+
+def test_extract_text_from_bytes_matches_file(tmp_path):
+    """In-memory extraction should match extraction from a file on disk."""
+    data = "Pump manual\r\nCheck the valve pressure.\n".encode("utf-8")
+    path = tmp_path / "manual.txt"
+    path.write_bytes(data)
+    service = TextExtractionService()
+
+    from_bytes = service.extract_text_from_bytes(data, "text/plain", "manual.txt")
+
+    assert from_bytes == "Pump manual\nCheck the valve pressure."
+    assert from_bytes == service.extract_text(str(path), "text/plain")
+
+
+def test_extract_text_from_bytes_rejects_unsupported_format():
+    """Unsupported formats should raise ValueError."""
+    service = TextExtractionService()
+
+    with pytest.raises(ValueError):
+        service.extract_text_from_bytes(b"\x89PNG", "image/png", "photo.png")